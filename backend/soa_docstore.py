@@ -0,0 +1,139 @@
+import json
+import os
+
+import numpy as np
+
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.documents import Document
+
+# Layout colonnare (structure-of-arrays): una riga per chunk, con offset e
+# lunghezza del testo dentro texts.bin piu' pagina e id della sorgente
+META_DTYPE = np.dtype([
+    ("offset", np.int64),
+    ("length", np.int32),
+    ("page", np.int16),
+    ("src_id", np.int32),
+])
+
+
+class SoADocstore(Docstore, AddableMixin):
+    """Docstore colonnare su file al posto del dict pickled di LangChain.
+
+    L'InMemoryDocstore serializza un Document Python per chunk in un unico
+    pickle gigante, rendendo load_local lento e costoso in memoria su corpora
+    grandi. Qui i testi vivono concatenati in texts.bin e i metadati in un
+    array numpy strutturato (meta.npy): l'avvio si riduce a un mmap piu'
+    qualche lettura numpy e il lookup per id e' O(1) senza materializzare
+    nulla in RAM.
+    """
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._texts_path = os.path.join(directory, "texts.bin")
+        self._meta_path = os.path.join(directory, "meta.npy")
+        self._sources_path = os.path.join(directory, "sources.json")
+        self._ids_path = os.path.join(directory, "ids.json")
+        self._load()
+
+    def _load(self):
+        self._meta = None          # righe gia' flushate (np.memmap)
+        self._pending_rows = []    # righe aggiunte e non ancora flushate
+        self._sources = []         # src_id -> percorso della sorgente
+        self._source_ids = {}      # percorso -> src_id
+        self._id_list = []         # riga -> docstore id
+        self._id_to_row = {}       # docstore id -> riga
+        if os.path.exists(self._meta_path):
+            self._meta = np.load(self._meta_path, mmap_mode="r")
+        if os.path.exists(self._sources_path):
+            with open(self._sources_path) as f:
+                self._sources = json.load(f)
+            self._source_ids = {source: i for i, source in enumerate(self._sources)}
+        if os.path.exists(self._ids_path):
+            with open(self._ids_path) as f:
+                self._id_list = json.load(f)
+            self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._id_list)}
+
+    def add(self, texts: dict) -> None:
+        """Appende i documenti a texts.bin e registra le righe di metadati."""
+        with open(self._texts_path, "ab") as f:
+            for doc_id, doc in texts.items():
+                data = doc.page_content.encode("utf-8")
+                offset = f.tell()
+                f.write(data)
+                source = str(doc.metadata.get("source", ""))
+                if source not in self._source_ids:
+                    self._source_ids[source] = len(self._sources)
+                    self._sources.append(source)
+                self._pending_rows.append((
+                    offset,
+                    len(data),
+                    int(doc.metadata.get("page", 0) or 0),
+                    self._source_ids[source],
+                ))
+                self._id_to_row[doc_id] = len(self._id_list)
+                self._id_list.append(doc_id)
+
+    def delete(self, ids) -> None:
+        raise NotImplementedError("SoADocstore è append-only: delete non supportato.")
+
+    def _row(self, row: int):
+        # Snapshot dei riferimenti: save() pubblica il nuovo meta.npy e poi
+        # rimpiazza (mai svuota in place) la lista delle righe pendenti, quindi
+        # una coppia di snapshot incoerente si risolve rileggendo self._meta
+        meta = self._meta
+        pending = self._pending_rows
+        flushed = 0 if meta is None else len(meta)
+        if row < flushed:
+            record = meta[row]
+            return int(record["offset"]), int(record["length"]), int(record["page"]), int(record["src_id"])
+        if row - flushed < len(pending):
+            return pending[row - flushed]
+        # Il flush ha appena spostato la riga su disco: ora sta nel meta nuovo
+        record = self._meta[row]
+        return int(record["offset"]), int(record["length"]), int(record["page"]), int(record["src_id"])
+
+    def search(self, search: str):
+        row = self._id_to_row.get(search)
+        if row is None:
+            return f"ID {search} not found."
+        offset, length, page, src_id = self._row(row)
+        with open(self._texts_path, "rb") as f:
+            f.seek(offset)
+            text = f.read(length).decode("utf-8")
+        return Document(page_content=text, metadata={"source": self._sources[src_id], "page": page})
+
+    def mget(self, ids):
+        return [self.search(doc_id) for doc_id in ids]
+
+    def save(self) -> None:
+        """Flusha le righe pendenti su meta.npy e i sidecar json.
+
+        La scrittura passa da un file temporaneo piu' os.replace: np.save
+        diretto troncherebbe l'inode che i thread di query tengono mmappato.
+        Il vecchio memmap resta valido finche' qualcuno lo referenzia e la
+        lista pendente viene sostituita (non svuotata in place) solo dopo la
+        pubblicazione del meta nuovo, cosi' _row vede sempre dati coerenti.
+        """
+        if self._pending_rows:
+            new_rows = np.array(self._pending_rows, dtype=META_DTYPE)
+            if self._meta is not None:
+                new_rows = np.concatenate([np.asarray(self._meta), new_rows])
+            tmp_path = self._meta_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, new_rows)
+            os.replace(tmp_path, self._meta_path)
+            self._meta = np.load(self._meta_path, mmap_mode="r")
+            self._pending_rows = []
+        with open(self._sources_path, "w") as f:
+            json.dump(self._sources, f)
+        with open(self._ids_path, "w") as f:
+            json.dump(self._id_list, f)
+
+    # save_local di FAISS picklea il docstore: nel pickle finisce solo il
+    # percorso, i dati restano nei file colonnari
+    def __getstate__(self):
+        return {"directory": self._directory}
+
+    def __setstate__(self, state):
+        self.__init__(state["directory"])
@@ -18,6 +18,14 @@ document.addEventListener('DOMContentLoaded', () => {
     const API_URL = 'http://localhost:8000';
     let generatedPdfBlob = null; // <-- Variabile per conservare il PDF generato
 
+    // Identificativo di sessione persistente: ogni browser ha la propria
+    // memoria conversazionale sul backend invece di condividerne una globale
+    let sessionId = localStorage.getItem('aegis_session_id');
+    if (!sessionId) {
+        sessionId = crypto.randomUUID();
+        localStorage.setItem('aegis_session_id', sessionId);
+    }
+
     // --- Gestione Upload Documenti (invariato) ---
     uploadForm.addEventListener('submit', async (e) => {
         e.preventDefault();
@@ -56,7 +64,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const response = await fetch(`${API_URL}/query/`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ question }),
+                body: JSON.stringify({ question, session_id: sessionId }),
             });
             const result = await response.json();
             updateLastMessage(result.answer);